@@ -1,6 +1,14 @@
+import sys
+
+from loguru import logger
+
 from archextractor import ArchExtractor
 
 if __name__ == "__main__":
+    # verbosity=-1 时只关心警告和错误，INFO 日志在格式化前就被过滤
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
     extractor = ArchExtractor()
 
     extractor.extractall(
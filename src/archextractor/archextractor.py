@@ -1,6 +1,9 @@
 import os
 import shutil
-from typing import Literal
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, Literal
 
 import patoolib
 from loguru import logger
@@ -9,6 +12,81 @@ from patoolib.util import PatoolError
 from .utils import is_auto_generated
 
 
+# 全局限制同时进行的解压（外部解压程序或进程内的 zip 并发解压）数量不超过 CPU 核数，
+# 即使多个 extractall 并行或 max_workers 设置得更大也不会过量创建子进程或打开文件
+_SUBPROC_SEM = threading.BoundedSemaphore(os.cpu_count() or 4)
+
+# 解压后总大小低于该阈值的 zip 直接串行解压，线程调度开销不值得
+_ZIP_PARALLEL_MIN_SIZE = 1024 * 1024
+
+
+def _prefetch(fd: int) -> None:
+    # 提示内核异步预读整个文件到页缓存，使各线程的读取与解压重叠；不支持的平台直接跳过
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+
+
+# 所有 zip 的成员解压共用一个线程池，总线程数不会随并发解压的压缩包数量增长
+_ZIP_WORKERS = os.cpu_count() or 4
+_ZIP_MEMBER_POOL = ThreadPoolExecutor(
+    max_workers=_ZIP_WORKERS, thread_name_prefix="archextractor-zip"
+)
+
+
+def _extract_zip_members(
+    src: str, dst: str, members: list[zipfile.ZipInfo], pwd: bytes | None
+) -> None:
+    # 每个任务打开自己的 ZipFile，不在线程间共享同一个文件对象
+    with zipfile.ZipFile(src) as zfile:
+        for member in members:
+            try:
+                zfile.extract(member, dst, pwd=pwd)
+            except FileExistsError:
+                # 其他线程抢先创建了同一个父目录，此时目录已存在，重试一次即可
+                zfile.extract(member, dst, pwd=pwd)
+
+
+def _extract_zip_parallel(src: str, dst: str, password: str | None = None) -> str:
+    # zip 的每个成员独立压缩，zlib 解压时会释放 GIL，因此可以用线程池并发解压各个成员
+    pwd = password.encode() if password else None
+    try:
+        os.makedirs(dst, exist_ok=True)
+        with zipfile.ZipFile(src) as zfile:
+            members = zfile.infolist()
+            total_size = sum(member.file_size for member in members)
+            # 存在重名成员时，多个线程会同时写入同一个目标文件；此时串行解压，保持后者覆盖前者
+            has_duplicates = len({member.filename for member in members}) != len(members)
+            if (
+                len(members) < 2
+                or total_size < _ZIP_PARALLEL_MIN_SIZE
+                or has_duplicates
+            ):
+                zfile.extractall(dst, pwd=pwd)
+                return dst
+            # 并发解压时各成员的读取位置分散，先让内核整体预读
+            _prefetch(zfile.fp.fileno())
+
+        # 按大小降序轮流分给各任务，使每个任务的解压量大致均衡
+        members.sort(key=lambda member: member.file_size, reverse=True)
+        workers = min(len(members), _ZIP_WORKERS)
+        futures = [
+            _ZIP_MEMBER_POOL.submit(
+                _extract_zip_members, src, dst, members[i::workers], pwd
+            )
+            for i in range(workers)
+        ]
+        # 逐个取结果，使任一任务的异常在此处抛出
+        for future in futures:
+            future.result()
+    except Exception as exc:
+        raise PatoolError(f"error extracting {src}: {exc}") from exc
+    return dst
+
+
 class ArchExtractor:
     """
     A class for extracting archive files, which wraps the patoolib library
@@ -36,22 +114,139 @@ class ArchExtractor:
 
     @staticmethod
     def _remove_auto_generated(dst: str) -> None:
-        for root, dirs, files in os.walk(dst, topdown=True):
-            for dirname in list(dirs):
-                dirpath = os.path.join(root, dirname)
-                if is_auto_generated(dirpath) and os.path.exists(dirpath):
-                    shutil.rmtree(dirpath)
-                    dirs.remove(dirname)
-                    logger.info(
-                        f"Removed the file {dirpath} because it is auto generated by the system or tool"
-                    )
-            for file in files:
-                filepath = os.path.join(root, file)
-                if is_auto_generated(filepath) and os.path.exists(filepath):
-                    os.remove(filepath)
-                    logger.info(
-                        f"Removed the file {filepath} because it is auto generated by the system or tool"
+        # 用显式栈做一次 os.scandir 深度优先遍历：DirEntry 自带类型信息，
+        # 且条目由 scandir 刚刚列出，无需再用 os.path.exists 确认其存在
+        # 每个目录的条目先整体读出，删除时不会与仍在进行的 scandir 交错
+        removed: list[str] = []
+        stack = [dst]
+        try:
+            while stack:
+                path = stack.pop()
+                try:
+                    with os.scandir(path) as it:
+                        entries = list(it)
+                except OSError as exc:
+                    # 与 os.walk 一致：无法列出的目录直接跳过，只有真正的删除失败才向上抛出
+                    logger.warning(
+                        f"Skipped the directory {path}: {exc.__class__.__name__}: {exc}"
                     )
+                    continue
+                for entry in entries:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_auto_generated(entry.path):
+                        if is_dir:
+                            stack.append(entry.path)
+                        continue
+                    # 条目可能已被并发的解压/清理移除：只容忍 FileNotFoundError，
+                    # 权限不足等其他错误仍交给调用方记录；只统计确实由本次删除的条目
+                    if is_dir:
+                        if not ArchExtractor._rmtree_missing_ok(entry.path):
+                            continue
+                    else:
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            continue
+                    removed.append(entry.path)
+
+        finally:
+            # 循环内不逐条记录日志：汇总为一条 info，明细仅在启用 debug 时才惰性拼接
+            if removed:
+                logger.info(
+                    f"Removed {len(removed)} files under {dst} because they are auto generated by the system or tool"
+                )
+                logger.opt(lazy=True).debug(
+                    "Removed auto generated files: {}", lambda: ", ".join(removed)
+                )
+
+    @staticmethod
+    def _rmtree_missing_ok(path: str) -> bool:
+        # 返回 False 表示 path 在删除前就已不存在
+        vanished = False
+
+        def onexc(function, failed_path, exc):
+            nonlocal vanished
+            if not isinstance(exc, FileNotFoundError):
+                raise exc
+            if failed_path == path:
+                vanished = True
+
+        shutil.rmtree(path, onexc=onexc)
+        return not vanished
+
+    @staticmethod
+    def _remove_source(src: str) -> None:
+        # 直接删除并容忍文件已不存在，省去事先 os.path.exists 的一次 stat
+        try:
+            os.remove(src)
+        except FileNotFoundError:
+            return
+        logger.info(f"Removed the file {src} because cleanup is enabled")
+
+    @staticmethod
+    def _iter_archives(dst: str) -> Iterator[str]:
+        # 复用 DirEntry 缓存的类型信息，避免每个条目再拼接路径并重新 stat
+        stack = [dst]
+        while stack:
+            path = stack.pop()
+            try:
+                it = os.scandir(path)
+            except OSError as exc:
+                # 与 os.walk 一致：无法列出的目录（eg. tar 保留的 0o000 权限）直接跳过
+                logger.warning(
+                    f"Skipped the directory {path}: {exc.__class__.__name__}: {exc}"
+                )
+                continue
+            with it:
+                for entry in it:
+                    # 自动生成的条目留给最终的清理，不深入也不当作压缩包解压（eg. __MACOSX/._a.zip）
+                    if is_auto_generated(entry.path):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and patoolib.is_archive(
+                        entry.path
+                    ):
+                        yield entry.path
+
+    @staticmethod
+    def _outermost_dirs(dirs: Iterable[str]) -> list[str]:
+        # 去重并丢弃已被其他目录包含的子目录，避免同一子树被重复扫描
+        outermost: list[str] = []
+        # 按路径分量排序，保证子目录紧跟在其父目录之后
+        for path in sorted(set(dirs), key=lambda path: path.split(os.sep)):
+            if outermost and path.startswith(os.path.join(outermost[-1], "")):
+                continue
+            outermost.append(path)
+        return outermost
+
+    def _extract_serially(
+        self,
+        sub_files: list[str],
+        verbosity: int = 0,
+        program: str | None = None,
+        interactive: bool = False,
+        password: str | None = None,
+        cleanup: bool = False,
+    ) -> list[str] | None:
+        # 按固定顺序逐个解压到各自所在目录，同名成员的结果与串行解压一致（后解压的覆盖先解压的）
+        extracted_paths = []
+        for sub_file in sorted(sub_files):
+            extracted_path = self.extract(
+                src=sub_file,
+                dst=os.path.dirname(sub_file),
+                mode="x",
+                verbosity=verbosity,
+                program=program,
+                interactive=interactive,
+                password=password,
+                cleanup=cleanup,
+                _cleanup_root=False,
+            )
+            if extracted_path is None:
+                return None
+            extracted_paths.append(extracted_path)
+        return extracted_paths
 
     def test_archive(
         self,
@@ -111,7 +306,8 @@ class ArchExtractor:
         interactive: bool = False,
         password: str | None = None,
         cleanup: bool = False,
-    ):
+        max_workers: int | None = None,
+    ) -> str | None:
         """
         Extract all the archive files in the source path, including the nested archive files.
 
@@ -119,6 +315,7 @@ class ArchExtractor:
 
         Note:
             It will preserve the complete original directory structure of the extracted files.
+            Nested archives found in the same scan are extracted concurrently, each by its own external decompressor.
 
         Args:
             src (str): The source path of the archive file (only file path, not directory path).
@@ -129,62 +326,105 @@ class ArchExtractor:
             interactive (bool, optional): See `patoolib.extract_archive` for more details. Defaults to False.
             password (str | None, optional): See `patoolib.extract_archive` for more details. Defaults to None.
             cleanup (bool, optional): If the cleanup parameter is provided as True, the source archive file will be deleted after extraction. Defaults to False.
+            max_workers (int | None, optional): The maximum number of nested archives extracted at the same time. Defaults to None, which uses `os.cpu_count()`.
+
+        Returns:
+            str | None: The destination path if the archive file and all nested archive files were extracted, None otherwise
         """
         mode = self._validate_mode(mode)
 
         # 提取顶层压缩包
-        if (
-            self.extract(
-                src=src,
-                dst=dst,
-                mode="x",
-                verbosity=verbosity,
-                program=program,
-                interactive=interactive,
-                password=password,
-                cleanup=False,
-            )
-            is None
-        ):
+        extracted_path = self.extract(
+            src=src,
+            dst=dst,
+            mode="x",
+            verbosity=verbosity,
+            program=program,
+            interactive=interactive,
+            password=password,
+            cleanup=False,
+            _cleanup_root=False,
+        )
+        if extracted_path is None:
             return None
 
         processed_archives = {os.path.realpath(src)}
 
         # 扫描实际输出目录，而不是按压缩包文件名推断目录。压缩包可以直接
         # 在输出目录顶层释放文件，也可以释放和文件名无关的顶层目录。
-        while True:
-            extracted_nested_archive = False
-            for root, dirs, files in os.walk(dst):
-                for file in files:
-                    sub_file = os.path.join(root, file)
-                    real_sub_file = os.path.realpath(sub_file)
-                    if real_sub_file in processed_archives:
-                        continue
-                    if not patoolib.is_archive(sub_file):
-                        continue
-                    result = self.extract(
-                        src=sub_file,
-                        dst=os.path.dirname(sub_file),
-                        mode="x",
+        # 以工作队列代替递归/全树重扫：每一轮只扫描上一轮解压写入的目录，
+        # 本轮各压缩包实际解压到的目录再进入下一轮队列。
+        # 同一轮中输出目录互不相交的嵌套压缩包交给线程池并发调用外部解压程序；
+        # 整个解压过程共用一个线程池，避免每一层嵌套都重新创建。
+        # 直接使用 extract 返回的实际输出目录，不再由压缩包路径推算
+        pending_dirs = [extracted_path]
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            while pending_dirs:
+                candidates = []
+                for scan_dir in pending_dirs:
+                    for sub_file in self._iter_archives(scan_dir):
+                        real_sub_file = os.path.realpath(sub_file)
+                        if real_sub_file in processed_archives:
+                            continue
+                        processed_archives.add(real_sub_file)
+                        candidates.append(sub_file)
+
+                # 解压到同一目录（或其子目录）的压缩包放进同一个任务中串行解压，
+                # 避免同名成员被两个解压程序同时写入；只有互不相交的目录才并发
+                groups: dict[str, list[str]] = {}
+                group_roots = self._outermost_dirs(
+                    os.path.dirname(sub_file) for sub_file in candidates
+                )
+                for sub_file in candidates:
+                    sub_dir = os.path.dirname(sub_file)
+                    root = next(
+                        group_root
+                        for group_root in group_roots
+                        if sub_dir == group_root
+                        or sub_dir.startswith(os.path.join(group_root, ""))
+                    )
+                    groups.setdefault(root, []).append(sub_file)
+
+                futures = [
+                    executor.submit(
+                        self._extract_serially,
+                        sub_files=sub_files,
                         verbosity=verbosity,
                         program=program,
                         interactive=interactive,
                         password=password,
                         cleanup=cleanup,
                     )
-                    if result is None:
-                        return None
-                    processed_archives.add(real_sub_file)
-                    extracted_nested_archive = True
-            if not extracted_nested_archive:
-                break
+                    for sub_files in groups.values()
+                ]
+                # 等待本轮全部完成后再判断：同目录的兄弟压缩包解压到同一个目录，
+                # 若边解压边扫描，可能把另一个解压程序尚未写完的文件当作压缩包
+                extracted_dirs = []
+                failed = False
+                for future in as_completed(futures):
+                    extracted_paths = future.result()
+                    if extracted_paths is None:
+                        failed = True
+                    else:
+                        extracted_dirs.extend(extracted_paths)
+                if failed:
+                    return None
+
+                pending_dirs = self._outermost_dirs(extracted_dirs)
+
+        try:
+            # 整棵树解压完成后，只对输出目录做一次自动生成文件的清理
+            self._remove_auto_generated(dst)
+        except OSError as exc:
+            logger.error(
+                f"Failed to perform file-level operations: {exc.__class__.__name__}: {exc}"
+            )
 
         if mode == "e":
             self.flatten(dst=dst)
 
-        if cleanup and os.path.exists(src):
-            os.remove(src)
-            logger.info(f"Removed the file {src} because cleanup is enabled")
+        if cleanup:
+            self._remove_source(src)
 
         return dst
 
@@ -198,6 +438,7 @@ class ArchExtractor:
         interactive: bool = False,
         password: str | None = None,
         cleanup: bool = False,
+        _cleanup_root: bool = True,
     ) -> str | None:
         """
         Extract the archive file in the source path, but do not include nested archive files.
@@ -216,30 +457,48 @@ class ArchExtractor:
             interactive (bool, optional): See `patoolib.extract_archive` for more details. Defaults to False.
             password (str | None, optional): See `patoolib.extract_archive` for more details. Defaults to None.
             cleanup (bool, optional): If the cleanup parameter is provided as True, the source archive file will be deleted after extraction. Defaults to False.
+
+        Returns:
+            str | None: The directory the archive file was actually extracted to, None if it is not an archive file or the extraction failed
         """
         mode = self._validate_mode(mode)
 
-        # 测试该压缩包是否可解压
-        if not self.test_archive(
-            src=src,
-            verbosity=verbosity,
-            program=program,
-            interactive=interactive,
-            password=password,
-        ):
-            return
+        # 只按文件类型粗筛，不再预先调用 test_archive：那会为同一个压缩包多启动一次解压程序。
+        # 损坏的压缩包或伪装成压缩包的文件（eg. .flac）会在下方的 PatoolError 中被捕获。
+        if not patoolib.is_archive(src):
+            logger.error(f"The file {src} is not a valid archive file")
+            return None
 
         try:
             # 尝试提取该压缩文件
             # patool 会返回真实的解压目标路径；调用方可以用它判断本次解压是否成功。
-            extracted_path = patoolib.extract_archive(
-                src,
-                outdir=dst,
-                verbosity=verbosity,
+            # 只有 patool 自己也会选择 py_zipfile（系统中没有 7z/unzip 等外部程序）时，
+            # 才改用并发解压；其余情况仍按 patool 的程序优先级处理
+            format, compression = patoolib.get_archive_format(src)
+            resolved_program = patoolib.find_archive_program(
+                format,
+                "extract",
                 program=program,
-                interactive=interactive,
                 password=password,
+                compression=compression,
+                verbosity=verbosity,
             )
+            with _SUBPROC_SEM:
+                if resolved_program == "py_zipfile":
+                    if verbosity >= 0:
+                        patoolib.log.log_info(f"Extracting {src} ...")
+                    extracted_path = _extract_zip_parallel(src, dst, password=password)
+                    if verbosity >= 0:
+                        patoolib.log.log_info(f"... {src} extracted to `{dst}'.")
+                else:
+                    extracted_path = patoolib.extract_archive(
+                        src,
+                        outdir=dst,
+                        verbosity=verbosity,
+                        program=program,
+                        interactive=interactive,
+                        password=password,
+                    )
 
         except PatoolError as exc:
             logger.error(
@@ -249,15 +508,16 @@ class ArchExtractor:
 
         try:
             # 删除由操作系统或工具自动生成的文件夹/文件
-            self._remove_auto_generated(dst)
+            # extractall 会关闭此步骤，改为在整棵树解压完成后统一清理一次
+            if _cleanup_root:
+                self._remove_auto_generated(dst)
 
             if mode == "e":
                 self.flatten(dst=dst)
 
             # 只有在 patool 解压成功并完成后处理后，才删除源压缩包。
-            if cleanup and os.path.exists(src):
-                os.remove(src)
-                logger.info(f"Removed the file {src} because cleanup is enabled")
+            if cleanup:
+                self._remove_source(src)
 
         except OSError as exc:
             logger.error(
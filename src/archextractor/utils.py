@@ -45,6 +45,11 @@ IGNORE_FILE_PATTERN: list[re.Pattern[str]] = [
     ]
 ]
 
+# 将上述规则合并为单个正则分支，一次 search 即可完成全部匹配，避免逐条遍历列表
+IGNORE_FILE_REGEX: re.Pattern[str] = re.compile(
+    "|".join(f"(?:{r.pattern})" for r in IGNORE_FILE_PATTERN)
+)
+
 
 def is_auto_generated(path: str) -> bool:
     """
@@ -58,7 +63,7 @@ def is_auto_generated(path: str) -> bool:
     """
     # 将路径统一为 / 分隔，便于跨平台匹配
     norm = path.replace("\\", "/")
-    return any(r.search(norm) for r in IGNORE_FILE_PATTERN)
+    return IGNORE_FILE_REGEX.search(norm) is not None
 
 
 if __name__ == "__main__":
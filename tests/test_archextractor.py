@@ -1,6 +1,10 @@
+import os
 import tempfile
 import tarfile
+import threading
+import time
 import unittest
+import warnings
 import zipfile
 from pathlib import Path
 from unittest import mock
@@ -8,6 +12,7 @@ from unittest import mock
 from loguru import logger
 from patoolib.util import PatoolError
 
+import archextractor.archextractor
 from archextractor import ArchExtractor
 from archextractor.utils import is_auto_generated
 
@@ -57,6 +62,158 @@ class ArchExtractorTest(unittest.TestCase):
 
         self.assert_tree(out, {"inner.zip", "inside.txt"})
 
+    def make_zip_of_two_nested_zips_in_separate_dirs(self) -> Path:
+        first = self.make_zip(self.base / "first.zip", {"first.txt": "1"})
+        second = self.make_zip(self.base / "second.zip", {"second.txt": "2"})
+        top = self.base / "top.zip"
+        with zipfile.ZipFile(top, "w") as archive:
+            archive.write(first, "one/first.zip")
+            archive.write(second, "two/second.zip")
+        return top
+
+    def extract_nested_at_barrier(self, barrier: threading.Barrier):
+        extract = ArchExtractor.extract
+
+        def wait_then_extract(extractor, src, dst, **kwargs):
+            if Path(src).name in ("first.zip", "second.zip"):
+                barrier.wait()
+            return extract(extractor, src, dst, **kwargs)
+
+        return mock.patch.object(
+            ArchExtractor, "extract", autospec=True, side_effect=wait_then_extract
+        )
+
+    def test_extractall_expands_sibling_nested_archives_concurrently(self):
+        top = self.make_zip_of_two_nested_zips_in_separate_dirs()
+        out = self.base / "out"
+
+        with self.extract_nested_at_barrier(threading.Barrier(2, timeout=5)):
+            result = ArchExtractor().extractall(
+                src=str(top),
+                dst=str(out),
+                verbosity=-1,
+                cleanup=True,
+                max_workers=2,
+            )
+
+        self.assertEqual(result, str(out))
+        self.assert_tree(out, {"one/first.txt", "two/second.txt"})
+
+    def test_extractall_max_workers_limits_concurrent_extractions(self):
+        top = self.make_zip_of_two_nested_zips_in_separate_dirs()
+        out = self.base / "out"
+
+        with self.extract_nested_at_barrier(threading.Barrier(2, timeout=0.5)):
+            with self.assertRaises(threading.BrokenBarrierError):
+                ArchExtractor().extractall(
+                    src=str(top),
+                    dst=str(out),
+                    verbosity=-1,
+                    max_workers=1,
+                )
+
+    def test_extractall_serializes_siblings_sharing_an_output_directory(self):
+        first = self.make_zip(self.base / "a.zip", {"same.bin": "a" * 4096})
+        second = self.make_zip(self.base / "b.zip", {"same.bin": "b" * 4096})
+        top = self.base / "top.zip"
+        with zipfile.ZipFile(top, "w") as archive:
+            archive.write(first, "a.zip")
+            archive.write(second, "b.zip")
+        out = self.base / "out"
+
+        extract = ArchExtractor.extract
+        lock = threading.Lock()
+        active: dict[str, int] = {}
+        overlaps = []
+
+        def track_extract(extractor, src, dst, **kwargs):
+            with lock:
+                active[dst] = active.get(dst, 0) + 1
+                overlaps.append(active[dst])
+            try:
+                time.sleep(0.05)
+                return extract(extractor, src, dst, **kwargs)
+            finally:
+                with lock:
+                    active[dst] -= 1
+
+        with (
+            mock.patch(
+                "archextractor.archextractor._SUBPROC_SEM",
+                threading.BoundedSemaphore(4),
+            ),
+            mock.patch.object(
+                ArchExtractor, "extract", autospec=True, side_effect=track_extract
+            ),
+        ):
+            result = ArchExtractor().extractall(
+                src=str(top), dst=str(out), verbosity=-1, cleanup=True, max_workers=2
+            )
+
+        self.assertEqual(result, str(out))
+        self.assertEqual(max(overlaps), 1)
+        self.assert_tree(out, {"same.bin"})
+        self.assertEqual((out / "same.bin").read_text(), "b" * 4096)
+
+    def test_extractall_expands_archives_nested_in_subdirectories(self):
+        deepest = self.make_zip(self.base / "deepest.zip", {"deep.txt": "deep"})
+        inner = self.base / "inner.zip"
+        with zipfile.ZipFile(inner, "w") as archive:
+            archive.write(deepest, "level2/deepest.zip")
+        top = self.base / "top.zip"
+        with zipfile.ZipFile(top, "w") as archive:
+            archive.write(inner, "level1/inner.zip")
+            archive.writestr("level1 side/side.txt", "side")
+
+        out = self.base / "out"
+        ArchExtractor().extractall(src=str(top), dst=str(out), verbosity=-1, cleanup=True)
+
+        self.assert_tree(
+            out, {"level1/level2/deep.txt", "level1 side/side.txt"}
+        )
+
+    def scandir_denied(self, denied: Path):
+        scandir = os.scandir
+
+        def guarded_scandir(path="."):
+            if Path(path) == denied:
+                raise PermissionError(13, "Permission denied", str(path))
+            return scandir(path)
+
+        return mock.patch("os.scandir", side_effect=guarded_scandir)
+
+    def test_extractall_skips_directories_it_cannot_list(self):
+        inner = self.make_zip(self.base / "inner.zip", {"inside.txt": "nested"})
+        top = self.base / "top.zip"
+        with zipfile.ZipFile(top, "w") as archive:
+            archive.write(inner, "sub/inner.zip")
+            archive.writestr("locked/file.txt", "locked")
+        out = self.base / "out"
+
+        with self.scandir_denied(out / "locked"):
+            result = ArchExtractor().extractall(
+                src=str(top), dst=str(out), verbosity=-1, cleanup=True
+            )
+
+        self.assertEqual(result, str(out))
+        self.assert_tree(out, {"sub/inside.txt", "locked/file.txt"})
+
+    def test_extract_skips_unlistable_directories_during_cleanup(self):
+        archive = self.base / "archive.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("sub/ok.txt", "ok")
+            zf.writestr("locked/file.txt", "locked")
+        out = self.base / "out"
+
+        with self.scandir_denied(out / "locked"):
+            result = ArchExtractor().extract(
+                src=str(archive), dst=str(out), mode="e", verbosity=-1, cleanup=True
+            )
+
+        self.assertEqual(result, str(out))
+        self.assertTrue((out / "ok.txt").is_file())
+        self.assertFalse(archive.exists())
+
     def test_extractall_can_reuse_one_extractor_for_multiple_archives(self):
         first = self.make_zip(self.base / "first.zip", {"first.txt": "1"})
         second = self.make_zip(self.base / "second.zip", {"second.txt": "2"})
@@ -75,9 +232,15 @@ class ArchExtractorTest(unittest.TestCase):
         out = self.base / "out"
         extractor = ArchExtractor()
 
-        with mock.patch(
-            "archextractor.archextractor.patoolib.extract_archive",
-            side_effect=PatoolError("simulated failure"),
+        with (
+            mock.patch(
+                "archextractor.archextractor.patoolib.extract_archive",
+                side_effect=PatoolError("simulated failure"),
+            ),
+            mock.patch(
+                "archextractor.archextractor._extract_zip_parallel",
+                side_effect=PatoolError("simulated failure"),
+            ),
         ):
             result = extractor.extract(
                 src=str(source),
@@ -89,11 +252,148 @@ class ArchExtractorTest(unittest.TestCase):
         self.assertIsNone(result)
         self.assertTrue(source.exists())
 
+    def test_failed_extraction_skips_auto_generated_cleanup(self):
+        source = self.base / "fake.zip"
+        source.write_bytes(b"PK\x03\x04" + b"\x00" * 64)
+        out = self.base / "out"
+
+        with mock.patch.object(
+            ArchExtractor, "_remove_auto_generated"
+        ) as remove_auto_generated:
+            extract_result = ArchExtractor().extract(
+                src=str(source), dst=str(out), verbosity=-1
+            )
+            extractall_result = ArchExtractor().extractall(
+                src=str(source), dst=str(out), verbosity=-1
+            )
+
+        self.assertIsNone(extract_result)
+        self.assertIsNone(extractall_result)
+        remove_auto_generated.assert_not_called()
+
+    def test_extract_does_not_run_a_separate_test_pass(self):
+        source = self.make_zip(self.base / "source.zip", {"file.txt": "content"})
+        out = self.base / "out"
+
+        with mock.patch(
+            "archextractor.archextractor.patoolib.test_archive"
+        ) as test_archive:
+            ArchExtractor().extract(src=str(source), dst=str(out), verbosity=-1)
+
+        test_archive.assert_not_called()
+        self.assert_tree(out, {"file.txt"})
+
+    def test_extract_passes_caller_program_to_patool_unchanged(self):
+        source = self.make_zip(self.base / "archive.zip", {"file.txt": "content"})
+        # 非 py_zipfile 时 extract_archive 收到的仍是调用方传入的 program，由 patool 自行选择
+        for program in (None, "/usr/bin/7z"):
+            with self.subTest(program=program):
+                with (
+                    mock.patch(
+                        "archextractor.archextractor.patoolib.find_archive_program",
+                        return_value="/usr/bin/7z",
+                    ) as find_archive_program,
+                    mock.patch(
+                        "archextractor.archextractor.patoolib.extract_archive"
+                    ) as extract_archive,
+                ):
+                    ArchExtractor().extract(
+                        src=str(source),
+                        dst=str(self.base / "out"),
+                        verbosity=-1,
+                        program=program,
+                    )
+
+                find_archive_program.assert_called_once()
+                self.assertEqual(extract_archive.call_args.kwargs["program"], program)
+
+    def extract_with_zip_backend(self, source: Path, out: Path):
+        pool = archextractor.archextractor._ZIP_MEMBER_POOL
+        with (
+            mock.patch("archextractor.archextractor._ZIP_WORKERS", 4),
+            mock.patch(
+                "archextractor.archextractor.patoolib.find_archive_program",
+                return_value="py_zipfile",
+            ),
+            mock.patch(
+                "archextractor.archextractor.patoolib.extract_archive"
+            ) as extract_archive,
+            mock.patch.object(pool, "submit", wraps=pool.submit) as submit,
+        ):
+            result = ArchExtractor().extract(
+                src=str(source), dst=str(out), verbosity=-1
+            )
+
+        extract_archive.assert_not_called()
+        return result, submit
+
+    def test_extract_large_zip_members_in_parallel(self):
+        entries = {f"dir/part{i}.bin": str(i) * (512 * 1024) for i in range(4)}
+        source = self.make_zip(self.base / "large.zip", entries)
+        out = self.base / "out"
+
+        result, submit = self.extract_with_zip_backend(source, out)
+
+        self.assertEqual(result, str(out))
+        self.assertEqual(submit.call_count, 4)
+        self.assert_tree(out, set(entries))
+        for name, content in entries.items():
+            self.assertEqual((out / name).read_text(), content)
+
+    def test_extract_zip_with_duplicate_names_keeps_last_entry(self):
+        source = self.base / "duplicates.zip"
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            with zipfile.ZipFile(source, "w") as archive:
+                for i in range(4):
+                    archive.writestr("same.bin", str(i) * (512 * 1024))
+        out = self.base / "out"
+
+        result, submit = self.extract_with_zip_backend(source, out)
+
+        self.assertEqual(result, str(out))
+        submit.assert_not_called()
+        self.assertEqual((out / "same.bin").read_text(), "3" * (512 * 1024))
+
+    def test_extract_zip_uses_patool_when_it_prefers_an_external_program(self):
+        source = self.make_zip(self.base / "source.zip", {"file.txt": "content"})
+        out = self.base / "out"
+
+        with (
+            mock.patch(
+                "archextractor.archextractor.patoolib.find_archive_program",
+                return_value="/usr/bin/7z",
+            ),
+            mock.patch(
+                "archextractor.archextractor.patoolib.extract_archive",
+                return_value=str(out),
+            ) as extract_archive,
+            mock.patch(
+                "archextractor.archextractor._extract_zip_parallel"
+            ) as extract_zip_parallel,
+        ):
+            ArchExtractor().extract(src=str(source), dst=str(out), verbosity=-1)
+
+        extract_archive.assert_called_once()
+        extract_zip_parallel.assert_not_called()
+
+    def test_extract_corrupt_zip_keeps_source(self):
+        source = self.base / "corrupt.zip"
+        source.write_bytes(b"PK\x03\x04" + b"\x00" * 64)
+        out = self.base / "out"
+
+        result = ArchExtractor().extract(
+            src=str(source), dst=str(out), verbosity=-1, cleanup=True
+        )
+
+        self.assertIsNone(result)
+        self.assertTrue(source.exists())
+
     def test_extractall_does_not_delete_source_when_nested_archive_fails(self):
         source = self.make_zip(self.base / "source.zip", {"file.txt": "content"})
         out = self.base / "out"
 
-        def extract_archive(src, outdir, **kwargs):
+        def extract_archive(src, *args, **kwargs):
             if Path(src) == source:
                 out.mkdir()
                 (out / "nested.zip").write_text("not extracted yet")
@@ -101,11 +401,14 @@ class ArchExtractorTest(unittest.TestCase):
             raise PatoolError("simulated nested failure")
 
         with (
-            mock.patch.object(ArchExtractor, "test_archive", return_value=True),
             mock.patch(
                 "archextractor.archextractor.patoolib.extract_archive",
                 side_effect=extract_archive,
             ),
+            mock.patch(
+                "archextractor.archextractor._extract_zip_parallel",
+                side_effect=extract_archive,
+            ),
         ):
             result = ArchExtractor().extractall(
                 src=str(source),
@@ -195,10 +498,101 @@ class ArchExtractorTest(unittest.TestCase):
         self.assert_tree(out, {"file.txt"})
         self.assert_no_directories_below(out)
 
+    def test_extract_removes_auto_generated_entries(self):
+        source = self.make_zip(
+            self.base / "source.zip",
+            {
+                "docs/file.txt": "content",
+                "docs/.DS_Store": "finder",
+                "__MACOSX/docs/._file.txt": "apple double",
+            },
+        )
+        out = self.base / "out"
+
+        ArchExtractor().extract(src=str(source), dst=str(out), verbosity=-1)
+
+        self.assert_tree(out, {"docs/file.txt"})
+        self.assertFalse((out / "__MACOSX").exists())
+
+    def test_extractall_cleans_auto_generated_entries_once(self):
+        inner = self.make_zip(self.base / "inner.zip", {"inside.txt": "nested"})
+        top = self.base / "top.zip"
+        with zipfile.ZipFile(top, "w") as archive:
+            archive.write(inner, "inner.zip")
+            archive.writestr("__MACOSX/._inner.zip", "apple double, not a zip")
+        out = self.base / "out"
+
+        with mock.patch.object(
+            ArchExtractor,
+            "_remove_auto_generated",
+            wraps=ArchExtractor._remove_auto_generated,
+        ) as remove_auto_generated:
+            result = ArchExtractor().extractall(
+                src=str(top), dst=str(out), verbosity=-1, cleanup=True
+            )
+
+        self.assertEqual(result, str(out))
+        remove_auto_generated.assert_called_once_with(str(out))
+        self.assert_tree(out, {"inside.txt"})
+
+    def test_cleanup_skips_entries_that_vanish_before_removal(self):
+        root = self.base / "out"
+        (root / "__MACOSX").mkdir(parents=True)
+        (root / ".DS_Store").write_text("finder")
+        (root / "file.txt").write_text("content")
+
+        def vanish_first(path):
+            if not is_auto_generated(path):
+                return False
+            target = Path(path)
+            if target.is_dir():
+                target.rmdir()
+            else:
+                target.unlink()
+            return True
+
+        with (
+            mock.patch(
+                "archextractor.archextractor.is_auto_generated",
+                side_effect=vanish_first,
+            ),
+            mock.patch("archextractor.archextractor.logger") as log,
+        ):
+            ArchExtractor._remove_auto_generated(str(root))
+
+        log.info.assert_not_called()
+        self.assert_tree(root, {"file.txt"})
+
+    def test_cleanup_reports_errors_other_than_missing_entries(self):
+        root = self.base / "out"
+        (root / "__MACOSX").mkdir(parents=True)
+
+        def rmtree(path, onexc):
+            onexc(os.rmdir, path, PermissionError(13, "Permission denied", path))
+
+        with (
+            mock.patch(
+                "archextractor.archextractor.shutil.rmtree", side_effect=rmtree
+            ),
+            mock.patch("archextractor.archextractor.logger") as log,
+        ):
+            with self.assertRaises(PermissionError):
+                ArchExtractor._remove_auto_generated(str(root))
+
+        log.info.assert_not_called()
+        self.assertTrue((root / "__MACOSX").exists())
+
     def test_paxheader_directory_is_auto_generated(self):
         self.assertTrue(is_auto_generated("archive/PaxHeader"))
         self.assertTrue(is_auto_generated("archive/PaxHeader/file"))
 
+    def test_auto_generated_matches_any_pattern_and_nothing_else(self):
+        self.assertTrue(is_auto_generated("archive/.DS_Store"))
+        self.assertTrue(is_auto_generated("archive\\Thumbs.db"))
+        self.assertTrue(is_auto_generated("archive/~$report.docx"))
+        self.assertFalse(is_auto_generated("archive/report.docx"))
+        self.assertFalse(is_auto_generated("archive/Thumbs.db.txt"))
+
 
 if __name__ == "__main__":
     unittest.main()